@@ -1,34 +1,291 @@
+import hashlib
 import json
+import mmap
 import os
-from typing import Dict, List, Optional, Any
+import sys
+from functools import cached_property
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any
 from datetime import datetime
 
+try:
+    import orjson
+
+    def _loads(dados: bytes) -> Any:
+        return orjson.loads(dados)
+
+    def _dumps(objeto: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(objeto, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    def _loads(dados: bytes) -> Any:
+        # json.loads não aceita memoryview (caminho mmap de _ler_arquivo)
+        if isinstance(dados, memoryview):
+            dados = bytes(dados)
+        return json.loads(dados)
+
+    def _dumps(objeto: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(objeto, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(objeto, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_VIRGULA_PARA_PONTO = str.maketrans({",": "."})
+
+_SIM = frozenset({"s", "sim", "y", "yes"})
+_NAO = frozenset({"n", "não", "nao", "no"})
+
+_stdin_readline = sys.stdin.readline
+_EXIBIR_PROMPTS = sys.stdin.isatty() or bool(os.environ.get("ESTOQUE_PROMPTS"))
+
+
+def _ask(prompt: str) -> str:
+    if _EXIBIR_PROMPTS:
+        return input(prompt)
+    linha = _stdin_readline()
+    if not linha:
+        raise EOFError("fim da entrada")
+    return linha.rstrip("\n")
+
+_BANNER_MENU = (
+    "\n" + "=" * 50 + "\n"
+    "🏪 GERENCIADOR DE ESTOQUE - MENU PRINCIPAL\n"
+    + "=" * 50 + "\n"
+    "1. 📦 Adicionar produto\n"
+    "2. 📋 Listar produtos\n"
+    "3. 🔍 Buscar produto\n"
+    "4. ✏️ Atualizar produto\n"
+    "5. 🗑️ Remover produto\n"
+    "6. 📊 Gerar relatório\n"
+    "7. 🔄 Ordenar produtos\n"
+    "8. 💾 Salvar estoque\n"
+    "9. 🔄 Recarregar estoque\n"
+    "10. 🗑️ Zerar estoque\n"
+    "0. 🚪 Sair\n"
+    + "-" * 50 + "\n"
+)
+
+_BANNER_ORDENAR = (
+    "\n🔄 ORDENAR PRODUTOS\n"
+    + "-" * 20 + "\n"
+    "1. Por nome (A-Z)\n"
+    "2. Por preço (menor para maior)\n"
+    "3. Por quantidade (maior para menor)\n"
+    "4. Por categoria (A-Z)\n"
+)
+
+_BANNER_LISTA = "\n📋 LISTA DE PRODUTOS\n" + "=" * 80 + "\n"
+
+_LIMIAR_MMAP = 1 << 20
+
+
+def _ler_arquivo(caminho: str) -> Any:
+    if os.path.getsize(caminho) >= _LIMIAR_MMAP:
+        with open(caminho, 'rb') as arquivo:
+            mm = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                vista = memoryview(mm)
+                try:
+                    return _loads(vista)
+                finally:
+                    vista.release()
+            finally:
+                mm.close()
+    return _loads(Path(caminho).read_bytes())
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, error_model='numpy')
+    def _estatisticas(precos, qtds):
+        total_valor = 0.0
+        total_qtd = 0
+        i_max_preco = i_min_preco = i_max_qtd = 0
+        for i in range(precos.shape[0]):
+            preco = precos[i]
+            qtd = qtds[i]
+            total_valor += preco * qtd
+            total_qtd += qtd
+            if preco > precos[i_max_preco]:
+                i_max_preco = i
+            if preco < precos[i_min_preco]:
+                i_min_preco = i
+            if qtd > qtds[i_max_qtd]:
+                i_max_qtd = i
+        return total_valor, total_qtd, i_max_preco, i_min_preco, i_max_qtd
+else:
+    _estatisticas = None
+
 
 class GerenciadorEstoque:
      
-    def __init__(self, arquivo_estoque: str = "estoque.json"):
+    def __init__(self, arquivo_estoque: str = "estoque.json", pretty: bool = False,
+                 batch: bool = False):
         self.arquivo_estoque = arquivo_estoque
-        self.estoque = self.carregar_estoque()
-    
+        self.arquivo_journal = arquivo_estoque + ".log"
+        self.pretty = pretty or bool(os.environ.get("ESTOQUE_PRETTY"))
+        self.batch = batch and not sys.stdin.isatty()
+        self._dirty = False
+        self._journal_pendente = False
+        self._hash_salvo = None
+        self._versao_estoque = 0
+        self._cache_categorias = None
+        self._menu_opcoes = {
+            1: self.adicionar_produto,
+            2: self.listar_produtos,
+            3: self.buscar_produto,
+            4: self.atualizar_produto,
+            5: self.remover_produto,
+            6: self.relatorio_estoque,
+            7: self.ordenar_produtos,
+            8: self.salvar_estoque,
+            9: self._recarregar_estoque,
+            10: self.zerar_estoque,
+        }
+
+    @cached_property
+    def estoque(self) -> Dict[str, Any]:
+        dados = self.carregar_estoque()
+        self.__dict__["estoque"] = dados
+        self._reconstruir_indice_nome()
+        self._invalidar_caches()
+        if self._journal_pendente:
+            self._dirty = True
+        return dados
+
+    def _invalidar_caches(self) -> None:
+        self._versao_estoque += 1
+        self._precos = None
+        self._qtds = None
+
+    def _arrays_numericos(self):
+        if np is None:
+            return None
+        if self._precos is None:
+            produtos = self.estoque["produtos"]
+            n = len(produtos)
+            self._precos = np.fromiter((p["preco"] for p in produtos.values()), dtype=np.float64, count=n)
+            self._qtds = np.fromiter((p["quantidade"] for p in produtos.values()), dtype=np.int64, count=n)
+        return self._precos, self._qtds
+
+    def _now_iso(self) -> str:
+        return datetime.now().isoformat()
+
+    def _estoque_vazio(self) -> Dict[str, Any]:
+        return {"produtos": {}, "ultima_atualizacao": self._now_iso()}
+
+    def _reconstruir_indice_nome(self) -> None:
+        indice = {}
+        por_categoria = {}
+        for id_, produto in self.estoque["produtos"].items():
+            produto["_nome_lc"] = sys.intern(produto["nome"].casefold())
+            produto["_cat_lc"] = produto["categoria"].casefold()
+            indice[produto["_nome_lc"]] = id_
+            por_categoria.setdefault(produto["categoria"], []).append(produto)
+        self._indice_nome = indice
+        self._por_categoria = por_categoria
+
+    def _descartar_journal(self) -> None:
+        try:
+            os.remove(self.arquivo_journal)
+        except FileNotFoundError:
+            pass
+        self._journal_pendente = False
+
+    def _journal(self, op: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            with open(self.arquivo_journal, 'ab') as arquivo:
+                arquivo.write(_dumps({"op": op, "p": payload}) + b"\n")
+        except Exception as e:
+            print(f"Erro ao gravar journal: {e}")
+
+    def _reproduzir_journal(self, produtos: Dict[int, Dict[str, Any]]) -> None:
+        try:
+            log = Path(self.arquivo_journal).read_bytes()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Aviso: journal ilegível, ignorando: {e}")
+            return
+
+        aplicadas = 0
+        ignoradas = 0
+        for linha in log.splitlines():
+            if not linha.strip():
+                continue
+            # Uma linha truncada (queda no meio do append) não pode
+            # invalidar o arquivo base já carregado: pula e segue.
+            try:
+                entrada = _loads(linha)
+                op, p = entrada["op"], entrada["p"]
+                if op in ("add", "update"):
+                    produtos[p["id"]] = p
+                elif op == "remove":
+                    produtos.pop(p["id"], None)
+                elif op == "clear":
+                    produtos.clear()
+            except Exception:
+                ignoradas += 1
+                continue
+            aplicadas += 1
+
+        if ignoradas:
+            print(f"Aviso: {ignoradas} linha(s) corrompida(s) ignorada(s) no journal.")
+        if aplicadas:
+            self._journal_pendente = True
+            print(f"{aplicadas} operações pendentes do journal aplicadas.")
+
     def carregar_estoque(self) -> Dict[str, Any]:
         try:
-            if os.path.exists(self.arquivo_estoque):
-                with open(self.arquivo_estoque, 'r', encoding='utf-8') as arquivo:
-                    dados = json.load(arquivo)
-                    print(f"Estoque carregado com sucesso! {len(dados.get('produtos', []))} produtos encontrados.")
-                    return dados
-            else:
+            try:
+                dados = _ler_arquivo(self.arquivo_estoque)
+                produtos = dados.get("produtos", [])
+                if isinstance(produtos, list):
+                    dados["produtos"] = {p["id"]: p for p in produtos}
+                print(f"Estoque carregado com sucesso! {len(dados['produtos'])} produtos encontrados.")
+            except FileNotFoundError:
                 print("Arquivo de estoque não encontrado. Criando novo estoque...")
-                return {"produtos": [], "ultima_atualizacao": datetime.now().isoformat()}
+                dados = self._estoque_vazio()
+
+            self._reproduzir_journal(dados["produtos"])
+            return dados
         except Exception as e:
             print(f"Erro ao carregar estoque: {e}")
-            return {"produtos": [], "ultima_atualizacao": datetime.now().isoformat()}
+            return self._estoque_vazio()
     
     def salvar_estoque(self) -> bool:
         try:
-            self.estoque["ultima_atualizacao"] = datetime.now().isoformat()
-            with open(self.arquivo_estoque, 'w', encoding='utf-8') as arquivo:
-                json.dump(self.estoque, arquivo, ensure_ascii=False, indent=2)
+            if not self._dirty and self._hash_salvo is not None:
+                print("Nenhuma alteração para salvar.")
+                return True
+
+            produtos_serializados = [{k: v for k, v in p.items() if not k.startswith("_")}
+                                     for p in self.estoque["produtos"].values()]
+            hash_atual = hashlib.blake2b(_dumps(produtos_serializados), digest_size=8).digest()
+            if hash_atual == self._hash_salvo:
+                self._descartar_journal()
+                self._dirty = False
+                print("Nenhuma alteração para salvar.")
+                return True
+
+            self.estoque["ultima_atualizacao"] = self._now_iso()
+            dados = {**self.estoque, "produtos": produtos_serializados}
+            temporario = self.arquivo_estoque + ".tmp"
+            with open(temporario, 'wb', buffering=1 << 17) as arquivo:
+                arquivo.write(_dumps(dados, pretty=self.pretty))
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, self.arquivo_estoque)
+            self._descartar_journal()
+            self._hash_salvo = hash_atual
+            self._dirty = False
             print("Estoque salvo com sucesso!")
             return True
         except Exception as e:
@@ -37,8 +294,7 @@ class GerenciadorEstoque:
     
     def _converter_preco(self, preco_str: str) -> float:
         try:
-            preco_str = preco_str.replace(",", ".")
-            return float(preco_str)
+            return float(preco_str.translate(_VIRGULA_PARA_PONTO))
         except ValueError:
             raise ValueError("Formato de preço inválido")
 
@@ -47,40 +303,61 @@ class GerenciadorEstoque:
         print("-" * 30)
         
         try:
-            nome = input("Nome do produto: ").strip()
+            if self.batch:
+                campos = sys.stdin.readline().rstrip("\n").split("\t")
+                campos += [""] * (4 - len(campos))
+                nome = campos[0].strip()
+                preco_str = campos[1].strip()
+                quantidade_str = campos[2].strip()
+                categoria = campos[3].strip()
+            else:
+                nome = _ask("Nome do produto: ").strip()
+
             if not nome:
                 print("Nome do produto não pode estar vazio!")
                 return False
-            
-            for produto in self.estoque["produtos"]:
-                if produto["nome"].lower() == nome.lower():
-                    print(f"Produto '{nome}' já existe no estoque!")
-                    return False
-            
-            preco_str = input("Preço unitário (R$): ").strip()
+
+            produtos = self.estoque["produtos"]
+            chave = sys.intern(nome.casefold())
+            if chave in self._indice_nome:
+                print(f"Produto '{nome}' já existe no estoque!")
+                return False
+
+            if not self.batch:
+                preco_str = _ask("Preço unitário (R$): ").strip()
             preco = self._converter_preco(preco_str)
             if preco < 0:
                 print("Preço não pode ser negativo!")
                 return False
-            
-            quantidade = int(input("Quantidade em estoque: "))
+
+            if not self.batch:
+                quantidade_str = _ask("Quantidade em estoque: ")
+            quantidade = int(quantidade_str)
             if quantidade < 0:
                 print("Quantidade não pode ser negativa!")
                 return False
-            
-            categoria = input("Categoria (opcional): ").strip()
-            
+
+            if not self.batch:
+                categoria = _ask("Categoria (opcional): ").strip()
+
             novo_produto = {
-                "id": len(self.estoque["produtos"]) + 1,
+                "id": max(self.estoque["produtos"], default=0) + 1,
                 "nome": nome,
                 "preco": preco,
                 "quantidade": quantidade,
                 "categoria": categoria or "Sem categoria",
-                "data_cadastro": datetime.now().isoformat()
+                "data_cadastro": self._now_iso(),
+                "_nome_lc": chave,
+                "_cat_lc": (categoria or "Sem categoria").casefold()
             }
-            
-            self.estoque["produtos"].append(novo_produto)
-            
+
+            self.estoque["produtos"][novo_produto["id"]] = novo_produto
+            self._indice_nome[chave] = novo_produto["id"]
+            self._por_categoria.setdefault(novo_produto["categoria"], []).append(novo_produto)
+            self._invalidar_caches()
+            self._journal("add", {k: v for k, v in novo_produto.items() if not k.startswith("_")})
+            self._dirty = True
+
             print(f"Produto '{nome}' adicionado com sucesso!")
             print(f"   Preço: R$ {preco:.2f}")
             print(f"   Quantidade: {quantidade}")
@@ -95,10 +372,54 @@ class GerenciadorEstoque:
             print(f"Erro inesperado: {e}")
             return False
     
+    def adicionar_em_lote(self, itens: Iterable[Dict[str, Any]]) -> int:
+        produtos = self.estoque["produtos"]
+        proximo_id = max(produtos, default=0) + 1
+        agora = self._now_iso()
+        adicionados = 0
+
+        for item in itens:
+            nome = str(item.get("nome", "")).strip()
+            if not nome:
+                continue
+            chave = sys.intern(nome.casefold())
+            if chave in self._indice_nome:
+                continue
+            try:
+                preco = float(item.get("preco", 0))
+                quantidade = int(item.get("quantidade", 0))
+            except (TypeError, ValueError):
+                continue
+            if preco < 0 or quantidade < 0:
+                continue
+            categoria = str(item.get("categoria") or "").strip() or "Sem categoria"
+
+            novo_produto = {
+                "id": proximo_id,
+                "nome": nome,
+                "preco": preco,
+                "quantidade": quantidade,
+                "categoria": categoria,
+                "data_cadastro": agora,
+                "_nome_lc": chave,
+                "_cat_lc": categoria.casefold()
+            }
+            produtos[proximo_id] = novo_produto
+            self._indice_nome[chave] = proximo_id
+            self._por_categoria.setdefault(categoria, []).append(novo_produto)
+            proximo_id += 1
+            adicionados += 1
+
+        if adicionados:
+            self._invalidar_caches()
+            self._dirty = True
+            self.salvar_estoque()
+            print(f"{adicionados} produtos adicionados em lote.")
+        return adicionados
+
     def listar_produtos(self) -> None:
-        print("\n📋 LISTA DE PRODUTOS")
-        print("=" * 80)
-        
+        sys.stdout.write(_BANNER_LISTA)
+
         if not self.estoque["produtos"]:
             print("Nenhum produto cadastrado no estoque.")
             return
@@ -107,24 +428,26 @@ class GerenciadorEstoque:
         print("2. Filtrar por categoria")
         
         try:
-            opcao = int(input("Escolha uma opção (1-2): "))
-            
-            produtos_para_exibir = self.estoque["produtos"]
+            opcao = int(_ask("Escolha uma opção (1-2): "))
             
+            produtos_para_exibir = list(self.estoque["produtos"].values())
+
             if opcao == 2:
-                categorias = list(set(produto["categoria"] for produto in self.estoque["produtos"]))
-                categorias.sort()
-                
+                if self._cache_categorias and self._cache_categorias[0] == self._versao_estoque:
+                    categorias = self._cache_categorias[1]
+                else:
+                    categorias = sorted(self._por_categoria)
+                    self._cache_categorias = (self._versao_estoque, categorias)
+
                 print(f"\nCategorias disponíveis:")
                 for i, categoria in enumerate(categorias, 1):
                     print(f"{i}. {categoria}")
                 
                 try:
-                    cat_opcao = int(input("Escolha a categoria (número): "))
+                    cat_opcao = int(_ask("Escolha a categoria (número): "))
                     if 1 <= cat_opcao <= len(categorias):
                         categoria_escolhida = categorias[cat_opcao - 1]
-                        produtos_para_exibir = [p for p in self.estoque["produtos"] 
-                                              if p["categoria"] == categoria_escolhida]
+                        produtos_para_exibir = list(self._por_categoria[categoria_escolhida])
                         print(f"\nFiltrando por categoria: {categoria_escolhida}")
                     else:
                         print("Opção inválida! Listando todos os produtos.")
@@ -143,10 +466,11 @@ class GerenciadorEstoque:
         print(f"\n{'ID':<4} {'Nome':<20} {'Preço':<12} {'Qtd':<6} {'Categoria':<15} {'Data Cadastro'}")
         print("-" * 80)
         
-        for produto in produtos_para_exibir:
-            data_cadastro = produto["data_cadastro"][:10]
-            print(f"{produto['id']:<4} {produto['nome']:<20} R$ {produto['preco']:<10.2f} "
-                  f"{produto['quantidade']:<6} {produto['categoria']:<15} {data_cadastro}")
+        linhas = [f"{p['id']:<4} {p['nome']:<20} R$ {p['preco']:<10.2f} "
+                  f"{p['quantidade']:<6} {p['categoria']:<15} {p['data_cadastro'][:10]}"
+                  for p in produtos_para_exibir]
+        sys.stdout.write("\n".join(linhas))
+        sys.stdout.write("\n")
         
         print(f"\nTotal de produtos exibidos: {len(produtos_para_exibir)}")
         if len(produtos_para_exibir) != len(self.estoque["produtos"]):
@@ -156,23 +480,25 @@ class GerenciadorEstoque:
         if nome is None:
             print("\n🔍 BUSCAR PRODUTO")
             print("-" * 20)
-            nome = input("Digite o nome do produto: ").strip()
+            nome = _ask("Digite o nome do produto: ").strip()
         
         if not nome:
             print("Nome do produto não pode estar vazio!")
             return None
         
-        for produto in self.estoque["produtos"]:
-            if produto["nome"].lower() == nome.lower():
-                print(f"\nProduto encontrado:")
-                print(f"   ID: {produto['id']}")
-                print(f"   Nome: {produto['nome']}")
-                print(f"   Preço: R$ {produto['preco']:.2f}")
-                print(f"   Quantidade: {produto['quantidade']}")
-                print(f"   Categoria: {produto['categoria']}")
-                print(f"   Data de cadastro: {produto['data_cadastro'][:10]}")
-                return produto
-        
+        produtos = self.estoque["produtos"]
+        id_produto = self._indice_nome.get(sys.intern(nome.casefold()))
+        if id_produto is not None:
+            produto = produtos[id_produto]
+            print(f"\nProduto encontrado:")
+            print(f"   ID: {produto['id']}")
+            print(f"   Nome: {produto['nome']}")
+            print(f"   Preço: R$ {produto['preco']:.2f}")
+            print(f"   Quantidade: {produto['quantidade']}")
+            print(f"   Categoria: {produto['categoria']}")
+            print(f"   Data de cadastro: {produto['data_cadastro'][:10]}")
+            return produto
+
         print(f"Produto '{nome}' não encontrado no estoque.")
         return None
     
@@ -180,17 +506,15 @@ class GerenciadorEstoque:
         print("\n✏️ ATUALIZAR PRODUTO")
         print("-" * 20)
         
-        nome = input("Digite o nome do produto a atualizar: ").strip()
+        nome = _ask("Digite o nome do produto a atualizar: ").strip()
         if not nome:
             print("Nome do produto não pode estar vazio!")
             return False
         
-        produto = None
-        for p in self.estoque["produtos"]:
-            if p["nome"].lower() == nome.lower():
-                produto = p
-                break
-        
+        produtos = self.estoque["produtos"]
+        id_produto = self._indice_nome.get(sys.intern(nome.casefold()))
+        produto = produtos.get(id_produto)
+
         if not produto:
             print(f"Produto '{nome}' não encontrado!")
             return False
@@ -199,7 +523,7 @@ class GerenciadorEstoque:
         print("Deixe em branco para manter o valor atual.")
         
         try:
-            novo_preco = input(f"Novo preço (atual: R$ {produto['preco']:.2f}): ").strip()
+            novo_preco = _ask(f"Novo preço (atual: R$ {produto['preco']:.2f}): ").strip()
             if novo_preco:
                 preco = self._converter_preco(novo_preco)
                 if preco < 0:
@@ -207,7 +531,7 @@ class GerenciadorEstoque:
                     return False
                 produto["preco"] = preco
             
-            nova_quantidade = input(f"Nova quantidade (atual: {produto['quantidade']}): ").strip()
+            nova_quantidade = _ask(f"Nova quantidade (atual: {produto['quantidade']}): ").strip()
             if nova_quantidade:
                 quantidade = int(nova_quantidade)
                 if quantidade < 0:
@@ -215,10 +539,19 @@ class GerenciadorEstoque:
                     return False
                 produto["quantidade"] = quantidade
             
-            nova_categoria = input(f"Nova categoria (atual: {produto['categoria']}): ").strip()
+            nova_categoria = _ask(f"Nova categoria (atual: {produto['categoria']}): ").strip()
             if nova_categoria:
+                antiga = produto["categoria"]
+                self._por_categoria[antiga].remove(produto)
+                if not self._por_categoria[antiga]:
+                    del self._por_categoria[antiga]
+                self._por_categoria.setdefault(nova_categoria, []).append(produto)
                 produto["categoria"] = nova_categoria
-            
+                produto["_cat_lc"] = nova_categoria.casefold()
+
+            self._invalidar_caches()
+            self._journal("update", {k: v for k, v in produto.items() if not k.startswith("_")})
+            self._dirty = True
             print(f"Produto '{produto['nome']}' atualizado com sucesso!")
             return True
             
@@ -233,22 +566,33 @@ class GerenciadorEstoque:
         print("\n🗑️ REMOVER PRODUTO")
         print("-" * 18)
         
-        nome = input("Digite o nome do produto a remover: ").strip()
+        nome = _ask("Digite o nome do produto a remover: ").strip()
         if not nome:
             print("Nome do produto não pode estar vazio!")
             return False
         
-        for i, produto in enumerate(self.estoque["produtos"]):
-            if produto["nome"].lower() == nome.lower():
-                confirmacao = input(f"Tem certeza que deseja remover '{produto['nome']}'? (s/n): ").lower()
-                if confirmacao in ['s', 'sim', 'y', 'yes']:
-                    produto_removido = self.estoque["produtos"].pop(i)
-                    print(f"Produto '{produto_removido['nome']}' removido com sucesso!")
-                    return True
-                else:
-                    print("Operação cancelada.")
-                    return False
-        
+        produtos = self.estoque["produtos"]
+        chave = sys.intern(nome.casefold())
+        id_produto = self._indice_nome.get(chave)
+        if id_produto is not None:
+            produto = produtos[id_produto]
+            confirmacao = _ask(f"Tem certeza que deseja remover '{produto['nome']}'? (s/n): ").lower()
+            if confirmacao in _SIM:
+                produto_removido = self.estoque["produtos"].pop(id_produto)
+                del self._indice_nome[chave]
+                cat = produto_removido["categoria"]
+                self._por_categoria[cat].remove(produto_removido)
+                if not self._por_categoria[cat]:
+                    del self._por_categoria[cat]
+                self._invalidar_caches()
+                self._journal("remove", {"id": id_produto})
+                self._dirty = True
+                print(f"Produto '{produto_removido['nome']}' removido com sucesso!")
+                return True
+            else:
+                print("Operação cancelada.")
+                return False
+
         print(f"Produto '{nome}' não encontrado!")
         return False
     
@@ -260,15 +604,46 @@ class GerenciadorEstoque:
             print("📭 Nenhum produto cadastrado no estoque.")
             return
         
-        produtos = self.estoque["produtos"]
+        produtos = list(self.estoque["produtos"].values())
         total_produtos = len(produtos)
-        total_valor = sum(p["preco"] * p["quantidade"] for p in produtos)
-        total_quantidade = sum(p["quantidade"] for p in produtos)
-        
-        produto_maior_preco = max(produtos, key=lambda p: p["preco"])
-        produto_menor_preco = min(produtos, key=lambda p: p["preco"])
-        produto_maior_qtd = max(produtos, key=lambda p: p["quantidade"])
-        
+        arrays = self._arrays_numericos()
+
+        if arrays is not None:
+            precos, qtds = arrays
+            if _estatisticas is not None:
+                total_valor, total_quantidade, i_max_preco, i_min_preco, i_max_qtd = _estatisticas(precos, qtds)
+                total_valor = float(total_valor)
+                total_quantidade = int(total_quantidade)
+                produto_maior_preco = produtos[i_max_preco]
+                produto_menor_preco = produtos[i_min_preco]
+                produto_maior_qtd = produtos[i_max_qtd]
+            else:
+                total_valor = float((precos * qtds).sum())
+                total_quantidade = int(qtds.sum())
+                produto_maior_preco = produtos[int(precos.argmax())]
+                produto_menor_preco = produtos[int(precos.argmin())]
+                produto_maior_qtd = produtos[int(qtds.argmax())]
+            estoque_baixo = [produtos[i] for i in np.flatnonzero(qtds < 10)]
+        else:
+            total_valor = 0.0
+            total_quantidade = 0
+            produto_maior_preco = produto_menor_preco = produto_maior_qtd = produtos[0]
+            estoque_baixo = []
+
+            for p in produtos:
+                preco = p["preco"]
+                quantidade = p["quantidade"]
+                total_valor += preco * quantidade
+                total_quantidade += quantidade
+                if preco > produto_maior_preco["preco"]:
+                    produto_maior_preco = p
+                if preco < produto_menor_preco["preco"]:
+                    produto_menor_preco = p
+                if quantidade > produto_maior_qtd["quantidade"]:
+                    produto_maior_qtd = p
+                if quantidade < 10:
+                    estoque_baixo.append(p)
+
         print(f"📈 Estatísticas Gerais:")
         print(f"   Total de produtos: {total_produtos}")
         print(f"   Total de itens em estoque: {total_quantidade}")
@@ -279,43 +654,54 @@ class GerenciadorEstoque:
         print(f"   Menor preço: {produto_menor_preco['nome']} - R$ {produto_menor_preco['preco']:.2f}")
         print(f"   Maior quantidade: {produto_maior_qtd['nome']} - {produto_maior_qtd['quantidade']} unidades")
         
-        estoque_baixo = [p for p in produtos if p["quantidade"] < 10]
         if estoque_baixo:
             print(f"\n⚠️ Produtos com estoque baixo (< 10 unidades):")
-            for produto in estoque_baixo:
-                print(f"   - {produto['nome']}: {produto['quantidade']} unidades")
+            linhas = [f"   - {p['nome']}: {p['quantidade']} unidades" for p in estoque_baixo]
+            sys.stdout.write("\n".join(linhas))
+            sys.stdout.write("\n")
         else:
             print(f"\n✅ Todos os produtos estão com estoque adequado (≥ 10 unidades)")
         
         print(f"\n📅 Última atualização: {self.estoque['ultima_atualizacao'][:19]}")
     
     def ordenar_produtos(self) -> None:
-        print("\n🔄 ORDENAR PRODUTOS")
-        print("-" * 20)
-        print("1. Por nome (A-Z)")
-        print("2. Por preço (menor para maior)")
-        print("3. Por quantidade (maior para menor)")
-        print("4. Por categoria (A-Z)")
-        
+        sys.stdout.write(_BANNER_ORDENAR)
+
         try:
-            opcao = int(input("Escolha o critério de ordenação (1-4): "))
-            
+            opcao = int(_ask("Escolha o critério de ordenação (1-4): "))
+
+            produtos = list(self.estoque["produtos"].values())
+
+            arrays = self._arrays_numericos()
+
             if opcao == 1:
-                self.estoque["produtos"].sort(key=lambda p: p["nome"].lower())
+                # O índice de nomes guarda um id por nome; um arquivo editado
+                # fora do app pode ter nomes repetidos, então ordena o
+                # conjunto completo em vez de materializar a partir do índice.
+                produtos.sort(key=itemgetter("_nome_lc", "id"))
                 print("Produtos ordenados por nome (A-Z)")
             elif opcao == 2:
-                self.estoque["produtos"].sort(key=lambda p: p["preco"])
+                if arrays is not None:
+                    produtos = [produtos[i] for i in np.argsort(arrays[0], kind='stable')]
+                else:
+                    produtos.sort(key=itemgetter("preco"))
                 print("Produtos ordenados por preço (menor para maior)")
             elif opcao == 3:
-                self.estoque["produtos"].sort(key=lambda p: p["quantidade"], reverse=True)
+                if arrays is not None:
+                    produtos = [produtos[i] for i in np.argsort(-arrays[1], kind='stable')]
+                else:
+                    produtos.sort(key=itemgetter("quantidade"), reverse=True)
                 print("Produtos ordenados por quantidade (maior para menor)")
             elif opcao == 4:
-                self.estoque["produtos"].sort(key=lambda p: p["categoria"].lower())
+                produtos.sort(key=itemgetter("_cat_lc"))
                 print("Produtos ordenados por categoria (A-Z)")
             else:
                 print("Opção inválida!")
                 return
-            
+
+            self.estoque["produtos"] = {p["id"]: p for p in produtos}
+            self._invalidar_caches()
+            self._dirty = True
             self.listar_produtos()
             
         except ValueError:
@@ -333,89 +719,81 @@ class GerenciadorEstoque:
         print(f"ATENÇÃO: Esta operação irá remover TODOS os {total_produtos} produtos do estoque!")
         print("Esta ação NÃO pode ser desfeita!")
         
-        confirmacao1 = input("Tem certeza que deseja zerar o estoque? (s/n): ").lower()
-        if confirmacao1 not in ['s', 'sim', 'y', 'yes']:
+        confirmacao1 = _ask("Tem certeza que deseja zerar o estoque? (s/n): ").lower()
+        if confirmacao1 not in _SIM:
             print("Operação cancelada.")
             return False
         
         print(f"\nÚLTIMA CONFIRMAÇÃO: Digite 'ZERAR' para confirmar a remoção de {total_produtos} produtos:")
-        confirmacao2 = input("Digite 'ZERAR' para confirmar: ").strip()
+        confirmacao2 = _ask("Digite 'ZERAR' para confirmar: ").strip()
         
         if confirmacao2.upper() != 'ZERAR':
             print("Confirmação incorreta. Operação cancelada.")
             return False
         
-        self.estoque["produtos"] = []
-        self.estoque["ultima_atualizacao"] = datetime.now().isoformat()
+        self.estoque["produtos"].clear()
+        self._indice_nome.clear()
+        self._por_categoria.clear()
+        self._invalidar_caches()
+        self._journal("clear")
+        self._dirty = True
+        self.estoque["ultima_atualizacao"] = self._now_iso()
         
         print(f"Estoque zerado com sucesso! {total_produtos} produtos removidos.")
         return True
     
+    def _recarregar_estoque(self) -> None:
+        print("\nATENÇÃO: Recarregar o estoque descartará todas as alterações não salvas!")
+        confirmacao = _ask("Deseja salvar as alterações antes de recarregar? (s/n): ").lower()
+
+        if confirmacao in _SIM:
+            if self.salvar_estoque():
+                print("Alterações salvas com sucesso!")
+            else:
+                print("Erro ao salvar. Continuando com recarregamento...")
+        elif confirmacao in _NAO:
+            print("Alterações serão descartadas!")
+            # Sem isto o replay do journal ressuscitaria as alterações
+            # descartadas a cada recarga/abertura.
+            self._descartar_journal()
+        else:
+            print("Opção inválida! Operação cancelada.")
+            return
+
+        self.estoque = self.carregar_estoque()
+        self._reconstruir_indice_nome()
+        self._invalidar_caches()
+        self._dirty = False
+
     def menu(self) -> None:
         while True:
-            print("\n" + "="*50)
-            print("🏪 GERENCIADOR DE ESTOQUE - MENU PRINCIPAL")
-            print("="*50)
-            print("1. 📦 Adicionar produto")
-            print("2. 📋 Listar produtos")
-            print("3. 🔍 Buscar produto")
-            print("4. ✏️ Atualizar produto")
-            print("5. 🗑️ Remover produto")
-            print("6. 📊 Gerar relatório")
-            print("7. 🔄 Ordenar produtos")
-            print("8. 💾 Salvar estoque")
-            print("9. 🔄 Recarregar estoque")
-            print("10. 🗑️ Zerar estoque")
-            print("0. 🚪 Sair")
-            print("-"*50)
-            
+            sys.stdout.write(_BANNER_MENU)
+
             try:
-                opcao = int(input("Escolha uma opção: "))
-                
-                if opcao == 1:
-                    self.adicionar_produto()
-                elif opcao == 2:
-                    self.listar_produtos()
-                elif opcao == 3:
-                    self.buscar_produto()
-                elif opcao == 4:
-                    self.atualizar_produto()
-                elif opcao == 5:
-                    self.remover_produto()
-                elif opcao == 6:
-                    self.relatorio_estoque()
-                elif opcao == 7:
-                    self.ordenar_produtos()
-                elif opcao == 8:
-                    self.salvar_estoque()
-                elif opcao == 9:
-                    print("\nATENÇÃO: Recarregar o estoque descartará todas as alterações não salvas!")
-                    confirmacao = input("Deseja salvar as alterações antes de recarregar? (s/n): ").lower()
-                    
-                    if confirmacao in ['s', 'sim', 'y', 'yes']:
-                        if self.salvar_estoque():
-                            print("Alterações salvas com sucesso!")
-                        else:
-                            print("Erro ao salvar. Continuando com recarregamento...")
-                    elif confirmacao in ['n', 'não', 'nao', 'no']:
-                        print("Alterações serão descartadas!")
-                    else:
-                        print("Opção inválida! Operação cancelada.")
-                        continue
-                    
-                    self.estoque = self.carregar_estoque()
-                elif opcao == 10:
-                    self.zerar_estoque()
-                elif opcao == 0:
-                    print("\nSalvando estoque antes de sair...")
-                    self.salvar_estoque()
+                opcao = int(_ask("Escolha uma opção: "))
+
+                if opcao == 0:
+                    if self._dirty:
+                        print("\nSalvando estoque antes de sair...")
+                        self.salvar_estoque()
                     print("Obrigado por usar o Gerenciador de Estoque!")
                     break
+
+                handler = self._menu_opcoes.get(opcao)
+                if handler:
+                    handler()
                 else:
                     print("Opção inválida! Escolha entre 0 e 10.")
-                    
+
             except ValueError:
                 print("Digite um número válido!")
+            except EOFError:
+                # Fim da entrada em modo script: encerra como a opção 0.
+                if self._dirty:
+                    print("\nSalvando estoque antes de sair...")
+                    self.salvar_estoque()
+                print("Fim da entrada. Até logo!")
+                break
             except KeyboardInterrupt:
                 print("\n\nOperação cancelada pelo usuário. Até logo!")
                 break
@@ -427,7 +805,8 @@ def main():
     print("Bem-vindo ao Gerenciador de Estoque!")
     print("="*60)
     
-    gerenciador = GerenciadorEstoque()
+    gerenciador = GerenciadorEstoque(pretty="--pretty" in sys.argv[1:],
+                                     batch="--batch" in sys.argv[1:])
     gerenciador.menu()
 
 